@@ -259,10 +259,18 @@ function merged_solids = gds_merge_solids_3d(solids, varargin)
               'Python script not found: %s', boolean_script);
     end
     
-    % Build Python command
-    cmd = sprintf('%s "%s" "%s" "%s" %s', ...
+    % Build Python command; at verbose level 2 the script also reports
+    % grouping, per-layer progress and a summary
+    if options.verbose >= 2
+        verbose_flag = ' -vv';
+    else
+        verbose_flag = '';
+    end
+    
+    cmd = sprintf('%s "%s"%s "%s" "%s" %s', ...
                   options.python_cmd, ...
                   boolean_script, ...
+                  verbose_flag, ...
                   input_json, ...
                   output_json, ...
                   options.operation);
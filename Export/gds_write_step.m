@@ -4,7 +4,7 @@ function gds_write_step(solids, filename, options)
 % gds_write_step(solids, filename)
 % gds_write_step(solids, filename, options)
 %
-% Writes an array of 3D solids to STEP AP203/AP214 format
+% Writes an array of 3D solids to STEP AP203/AP214/AP242 format
 % Uses Python pythonOCC bridge for STEP generation
 %
 % INPUT:
@@ -21,13 +21,15 @@ function gds_write_step(solids, filename, options)
 %                .layer_name   - Layer name for metadata
 %   filename : output STEP file path
 %   options  : (Optional) structure with fields:
-%       .format     - 'AP203' or 'AP214' (default: 'AP203')
+%       .format     - 'AP203', 'AP214' or 'AP242' (default: 'AP203')
 %       .precision  - Geometric tolerance (default: 1e-6)
 %       .materials  - Include material metadata (default: true)
 %       .units      - Unit scaling factor (default: 1.0)
 %       .python_cmd - Python command to use (default: 'python3')
 %       .keep_temp  - Keep temporary JSON file (default: false)
 %       .verbose    - Print progress messages (default: false)
+%       .merge_by_layer - Fuse the solids of each layer into one body
+%                     (default: false)
 %
 % OUTPUT:
 %   Writes STEP file to disk
@@ -97,9 +99,13 @@ if ~isfield(options, 'verbose')
     options.verbose = false;
 end
 
+if ~isfield(options, 'merge_by_layer')
+    options.merge_by_layer = false;
+end
+
 % Validate format
-if ~ismember(options.format, {'AP203', 'AP214'})
-    error('gds_write_step: format must be ''AP203'' or ''AP214'' --> %s', options.format);
+if ~ismember(options.format, {'AP203', 'AP214', 'AP242'})
+    error('gds_write_step: format must be ''AP203'', ''AP214'' or ''AP242'' --> %s', options.format);
 end
 
 % Ensure solids is a cell array
@@ -168,8 +174,14 @@ try
         fprintf('Calling Python STEP writer...\n');
     end
     
-    cmd = sprintf('%s "%s" "%s" "%s"', ...
-                  options.python_cmd, script_path, temp_json, filename);
+    if options.verbose
+        verbose_flag = ' --verbose';
+    else
+        verbose_flag = '';
+    end
+    
+    cmd = sprintf('%s "%s"%s "%s" "%s"', ...
+                  options.python_cmd, script_path, verbose_flag, temp_json, filename);
     
     [status, output] = system(cmd);
     
@@ -227,6 +239,7 @@ solid_data = struct();
 solid_data.format = options.format;
 solid_data.precision = options.precision;
 solid_data.units = options.units;
+solid_data.merge_by_layer = logical(options.merge_by_layer);
 solid_data.solids = cell(1, length(solids));
 
 for i = 1:length(solids)
@@ -328,6 +341,11 @@ try
     fprintf(fid, '  "format": "%s",\n', data.format);
     fprintf(fid, '  "precision": %g,\n', data.precision);
     fprintf(fid, '  "units": %g,\n', data.units);
+    if data.merge_by_layer
+        fprintf(fid, '  "merge_by_layer": true,\n');
+    else
+        fprintf(fid, '  "merge_by_layer": false,\n');
+    end
     fprintf(fid, '  "solids": [\n');
     
     for i = 1:length(data.solids)
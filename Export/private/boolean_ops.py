@@ -8,7 +8,9 @@ intersection, difference) on 3D solids using OpenCASCADE via pythonOCC.
 Called from MATLAB/Octave via system() for 3D solid merging operations.
 
 Usage:
-    python3 boolean_ops.py input.json output.json operation
+    python3 boolean_ops.py [-v|-vv] input.json output.json operation
+
+    -v logs grouping and merge summaries, -vv also logs each layer.
 
 Input JSON format:
 {
@@ -47,8 +49,12 @@ Part of gdsii-toolbox-146 Section 4.10 implementation
 
 import sys
 import json
+import logging
 import os
+import multiprocessing
+import operator
 import traceback
+from collections import defaultdict
 
 try:
     from OCC.Core.gp import gp_Pnt, gp_Vec
@@ -62,11 +68,20 @@ try:
         BRepAlgoAPI_Common,
         BRepAlgoAPI_Cut
     )
-    from OCC.Core.BRepTools import breptools_Read, breptools_Write
-    from OCC.Core.BRep import BRep_Builder
-    from OCC.Core.TopoDS import TopoDS_Shape, TopoDS_Compound
+    from OCC.Core.BOPAlgo import BOPAlgo_Options
+    from OCC.Core.OSD import OSD_ThreadPool
+    from OCC.Core.BRepTools import (
+        breptools_Read,
+        breptools_Write,
+        BRepTools_WireExplorer
+    )
+    from OCC.Core.BRep import BRep_Builder, BRep_Tool
+    from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+    from OCC.Core.GeomAbs import GeomAbs_Plane
+    from OCC.Core.TopoDS import TopoDS_Shape, TopoDS_Compound, topods_Face
+    from OCC.Core.TopTools import TopTools_ListOfShape
     from OCC.Core.TopExp import TopExp_Explorer
-    from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_FACE
+    from OCC.Core.TopAbs import TopAbs_SOLID, TopAbs_FACE, TopAbs_WIRE
     from OCC.Core.BRepGProp import brepgprop_VolumeProperties
     from OCC.Core.GProp import GProp_GProps
     from OCC.Core.BRepBndLib import brepbndlib_Add
@@ -79,6 +94,86 @@ except ImportError as e:
     PYTHONOCC_AVAILABLE = False
     IMPORT_ERROR = str(e)
 
+log = logging.getLogger('boolean_ops')
+
+
+def _static(cls, name):
+    """Look up a static OCC method across pythonOCC naming conventions"""
+    return getattr(cls, name + '_s', None) or getattr(cls, name)
+
+
+# Whether Boolean operations run on OCC's thread pool
+_occ_parallel = False
+
+
+def set_occ_parallel_mode(enabled=True):
+    """
+    Switch OCC's internal multithreading for all Boolean operations
+    
+    When enabled, the Boolean kernel runs its intersection steps on OCC's
+    own thread pool, which is sized to the number of CPUs. Layer pool
+    workers disable it, since the processes already occupy every CPU.
+    
+    Args:
+        enabled: True to run Boolean operations in parallel
+    """
+    global _occ_parallel
+    try:
+        _static(BOPAlgo_Options, 'SetParallelMode')(enabled)
+        if enabled:
+            _static(OSD_ThreadPool, 'DefaultPool')().Init(os.cpu_count() or 1)
+        _occ_parallel = enabled
+    except Exception as e:
+        log.warning(f"Warning: Could not set OCC parallel mode: {e}")
+
+
+if PYTHONOCC_AVAILABLE:
+    set_occ_parallel_mode(True)
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Extrusion vectors keyed by quantized height
+_VEC_CACHE_QUANTUM = 1e-12
+_vec_cache = {}
+
+
+def _make_polygon_wire(points, z):
+    """
+    Build a closed polygon wire in the plane at height z
+    
+    Args:
+        points: List of (x, y) float pairs, without a closing duplicate
+        z: Z coordinate of the wire
+    
+    Returns:
+        TopoDS_Wire: Closed polygon wire
+    """
+    if len(points) <= 4:
+        # Triangles and rectangles (most GDSII shapes) are built and closed
+        # by a single constructor call instead of one Add() per vertex
+        poly_maker = BRepBuilderAPI_MakePolygon(
+            *[gp_Pnt(x, y, z) for x, y in points], True)
+    else:
+        poly_maker = BRepBuilderAPI_MakePolygon()
+        add_point = poly_maker.Add
+        make_point = gp_Pnt
+        
+        for x, y in points:
+            add_point(make_point(x, y, z))
+        
+        # Close the polygon
+        poly_maker.Close()
+    
+    if not poly_maker.IsDone():
+        raise RuntimeError("Failed to create polygon wire")
+    
+    return poly_maker.Wire()
+
 
 def create_extruded_solid(polygon, z_bottom, z_top):
     """
@@ -92,28 +187,17 @@ def create_extruded_solid(polygon, z_bottom, z_top):
     Returns:
         TopoDS_Shape: Extruded solid
     """
-    # Remove duplicate last point if present (closed polygon)
-    if len(polygon) > 1 and polygon[0] == polygon[-1]:
-        polygon = polygon[:-1]
+    # Convert once to (x, y) float pairs and remove duplicate last point
+    # if present (closed polygon)
+    points = [(float(p[0]), float(p[1])) for p in polygon]
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
     
-    if len(polygon) < 3:
-        raise ValueError(f"Polygon must have at least 3 vertices, got {len(polygon)}")
+    if len(points) < 3:
+        raise ValueError(f"Polygon must have at least 3 vertices, got {len(points)}")
     
     # Create polygon wire at z_bottom
-    poly_maker = BRepBuilderAPI_MakePolygon()
-    
-    for point in polygon:
-        x, y = point[0], point[1]
-        pnt = gp_Pnt(x, y, z_bottom)
-        poly_maker.Add(pnt)
-    
-    # Close the polygon
-    poly_maker.Close()
-    
-    if not poly_maker.IsDone():
-        raise RuntimeError("Failed to create polygon wire")
-    
-    wire = poly_maker.Wire()
+    wire = _make_polygon_wire(points, float(z_bottom))
     
     # Create face from wire
     face_maker = BRepBuilderAPI_MakeFace(wire)
@@ -128,7 +212,12 @@ def create_extruded_solid(polygon, z_bottom, z_top):
     if abs(extrusion_height) < 1e-10:
         raise ValueError(f"Extrusion height too small: {extrusion_height}")
     
-    extrusion_vec = gp_Vec(0, 0, extrusion_height)
+    # Layers share a few heights, so reuse one vector per height
+    height_key = round(extrusion_height / _VEC_CACHE_QUANTUM)
+    extrusion_vec = _vec_cache.get(height_key)
+    if extrusion_vec is None:
+        extrusion_vec = gp_Vec(0, 0, extrusion_height)
+        _vec_cache[height_key] = extrusion_vec
     
     # Extrude face to create solid
     prism_maker = BRepPrimAPI_MakePrism(face, extrusion_vec)
@@ -141,34 +230,58 @@ def create_extruded_solid(polygon, z_bottom, z_top):
     return solid
 
 
-def get_solid_properties(shape):
+def get_bbox(shape):
     """
-    Get geometric properties of a solid
+    Get the axis-aligned bounding box of a shape
     
     Args:
         shape: TopoDS_Shape
     
     Returns:
-        dict: Properties including volume, bounding box, centroid
+        list: [xmin, ymin, zmin, xmax, ymax, zmax]
+    """
+    bbox = Bnd_Box()
+    brepbndlib_Add(shape, bbox)
+    return list(bbox.Get())
+
+
+def get_mass_properties(shape):
+    """
+    Get the volume and centroid of a solid
+    
+    Args:
+        shape: TopoDS_Shape
+    
+    Returns:
+        dict: Properties including volume and centroid
     """
     props = GProp_GProps()
     brepgprop_VolumeProperties(shape, props)
     
-    volume = props.Mass()
     centroid = props.CentreOfMass()
     
-    # Get bounding box
-    bbox = Bnd_Box()
-    brepbndlib_Add(shape, bbox)
-    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
-    
     return {
-        'volume': volume,
-        'centroid': [centroid.X(), centroid.Y(), centroid.Z()],
-        'bbox': [xmin, ymin, zmin, xmax, ymax, zmax]
+        'volume': props.Mass(),
+        'centroid': [centroid.X(), centroid.Y(), centroid.Z()]
     }
 
 
+def get_solid_properties(shape):
+    """
+    Get geometric properties of a solid
+    
+    Args:
+        shape: TopoDS_Shape
+    
+    Returns:
+        dict: Properties including volume, bounding box, centroid
+    """
+    props = get_mass_properties(shape)
+    props['bbox'] = get_bbox(shape)
+    
+    return props
+
+
 def extract_polygon_from_face(face):
     """
     Extract polygon coordinates from a planar face
@@ -183,11 +296,6 @@ def extract_polygon_from_face(face):
         list: List of [x, y, z] coordinates, or None if extraction fails
     """
     try:
-        from OCC.Core.BRepTools import BRepTools_WireExplorer
-        from OCC.Core.TopExp import TopExp_Explorer
-        from OCC.Core.TopAbs import TopAbs_WIRE, TopAbs_VERTEX
-        from OCC.Core.BRep import BRep_Tool
-        
         # Get outer wire
         wire_explorer = TopExp_Explorer(face, TopAbs_WIRE)
         if not wire_explorer.More():
@@ -240,21 +348,26 @@ def shape_to_solid_data(shape, z_bottom, z_top, metadata=None):
     polygon = []
     
     try:
-        # Find a face at approximately z_bottom
+        # Find a face at approximately z_bottom. Only horizontal planes can
+        # be the footprint, so side faces are rejected from their surface
+        # type without walking their wires
         explorer = TopExp_Explorer(shape, TopAbs_FACE)
         while explorer.More():
-            face = explorer.Current()
-            vertices = extract_polygon_from_face(face)
+            face = topods_Face(explorer.Current())
+            surface = BRepAdaptor_Surface(face)
             
-            if vertices and len(vertices) >= 3:
-                # Check if face is approximately at z_bottom
-                z_coords = [v[2] for v in vertices]
-                avg_z = sum(z_coords) / len(z_coords)
+            if surface.GetType() == GeomAbs_Plane:
+                plane = surface.Plane()
+                plane_z = plane.Location().Z()
                 
-                if abs(avg_z - z_bottom) < abs(avg_z - z_top):
-                    # This face is closer to bottom
-                    polygon = [[v[0], v[1]] for v in vertices]
-                    break
+                # Check if face is horizontal and closer to bottom than top
+                if (abs(plane.Axis().Direction().Z()) > 0.99 and
+                        abs(plane_z - z_bottom) < abs(plane_z - z_top)):
+                    vertices = extract_polygon_from_face(face)
+                    
+                    if vertices and len(vertices) >= 3:
+                        polygon = [[v[0], v[1]] for v in vertices]
+                        break
             
             explorer.Next()
     except Exception:
@@ -287,6 +400,92 @@ def shape_to_solid_data(shape, z_bottom, z_top, metadata=None):
     return solid_data
 
 
+def _build_boolean(operator_class, arguments, tools, precision):
+    """
+    Run a BRepAlgoAPI Boolean operation with a single Build() call
+    
+    The operator is default-constructed and fully configured before it is
+    built. The two-shape constructors build immediately, so configuring
+    one afterwards and calling Build() again would run the operation twice.
+    
+    Args:
+        operator_class: BRepAlgoAPI_Fuse, BRepAlgoAPI_Common or BRepAlgoAPI_Cut
+        arguments: List of TopoDS_Shape objects (operation objects)
+        tools: List of TopoDS_Shape objects (operation tools)
+        precision: Geometric tolerance
+    
+    Returns:
+        TopoDS_Shape: Result shape, or None if the operation failed
+    """
+    argument_list = TopTools_ListOfShape()
+    for shape in arguments:
+        argument_list.Append(shape)
+    
+    tool_list = TopTools_ListOfShape()
+    for shape in tools:
+        tool_list.Append(shape)
+    
+    bool_op = operator_class()
+    bool_op.SetArguments(argument_list)
+    bool_op.SetTools(tool_list)
+    bool_op.SetFuzzyValue(precision)
+    bool_op.SetRunParallel(_occ_parallel)
+    bool_op.Build()
+    
+    if not bool_op.IsDone() or bool_op.HasErrors():
+        return None
+    
+    return bool_op.Shape()
+
+
+def _reduce_pairwise(shapes, operator_class, precision, op_name):
+    """
+    Combine shapes with a binary boolean operator as a balanced tree
+    
+    Shapes are combined in pairs, then pairs of pairs, and so on, which
+    keeps the intermediate shapes small compared to folding every shape
+    into one growing result.
+    
+    Args:
+        shapes: List of TopoDS_Shape objects (at least one)
+        operator_class: Binary BRepAlgoAPI operator, e.g. BRepAlgoAPI_Fuse
+        precision: Geometric tolerance
+        op_name: Operation name used in warnings
+    
+    Returns:
+        TopoDS_Shape: Combined shape
+    """
+    op_index = 0
+    
+    while len(shapes) > 1:
+        next_level = []
+        
+        for i in range(0, len(shapes) - 1, 2):
+            op_index += 1
+            try:
+                result = _build_boolean(operator_class, [shapes[i]],
+                                        [shapes[i + 1]], precision)
+                
+                if result is None:
+                    log.warning(f"Warning: {op_name} operation {op_index} failed")
+                    next_level.append(shapes[i])
+                    continue
+                
+                next_level.append(result)
+                
+            except Exception as e:
+                log.warning(f"Warning: {op_name} operation {op_index} raised exception: {e}")
+                next_level.append(shapes[i])
+        
+        # Odd shape out is carried to the next level unchanged
+        if len(shapes) % 2:
+            next_level.append(shapes[-1])
+        
+        shapes = next_level
+    
+    return shapes[0]
+
+
 def perform_boolean_union(shapes, precision=1e-6):
     """
     Perform union (fuse) operation on multiple shapes
@@ -304,33 +503,28 @@ def perform_boolean_union(shapes, precision=1e-6):
     if len(shapes) == 1:
         return shapes[0]
     
-    # Start with first shape
-    result = shapes[0]
-    
-    # Fuse with remaining shapes
-    for i, shape in enumerate(shapes[1:], start=1):
-        try:
-            fuse_op = BRepAlgoAPI_Fuse(result, shape)
-            fuse_op.SetFuzzyValue(precision)
-            fuse_op.Build()
-            
-            if not fuse_op.IsDone():
-                print(f"Warning: Union operation {i} failed", file=sys.stderr)
-                continue
-            
-            result = fuse_op.Shape()
-            
-        except Exception as e:
-            print(f"Warning: Union operation {i} raised exception: {e}", file=sys.stderr)
-            continue
+    # One Fuse with the first shape as argument and the rest as tools runs a
+    # single intersection pass over all shapes instead of one per pair
+    try:
+        result = _build_boolean(BRepAlgoAPI_Fuse, shapes[:1], shapes[1:], precision)
+        if result is not None:
+            return result
+        
+        log.warning("Warning: N-ary union failed, falling back to pairwise union")
+        
+    except Exception as e:
+        log.warning(f"Warning: N-ary union raised exception: {e}")
     
-    return result
+    return _reduce_pairwise(list(shapes), BRepAlgoAPI_Fuse, precision, "Union")
 
 
 def perform_boolean_intersection(shapes, precision=1e-6):
     """
     Perform intersection (common) operation on multiple shapes
     
+    A Common with several tools intersects the object with the union of
+    the tools, so the shapes are intersected pairwise instead.
+    
     Args:
         shapes: List of TopoDS_Shape objects
         precision: Geometric tolerance
@@ -341,30 +535,7 @@ def perform_boolean_intersection(shapes, precision=1e-6):
     if not shapes:
         raise ValueError("No shapes provided for intersection operation")
     
-    if len(shapes) == 1:
-        return shapes[0]
-    
-    # Start with first shape
-    result = shapes[0]
-    
-    # Intersect with remaining shapes
-    for i, shape in enumerate(shapes[1:], start=1):
-        try:
-            common_op = BRepAlgoAPI_Common(result, shape)
-            common_op.SetFuzzyValue(precision)
-            common_op.Build()
-            
-            if not common_op.IsDone():
-                print(f"Warning: Intersection operation {i} failed", file=sys.stderr)
-                continue
-            
-            result = common_op.Shape()
-            
-        except Exception as e:
-            print(f"Warning: Intersection operation {i} raised exception: {e}", file=sys.stderr)
-            continue
-    
-    return result
+    return _reduce_pairwise(list(shapes), BRepAlgoAPI_Common, precision, "Intersection")
 
 
 def perform_boolean_difference(base_shape, tool_shapes, precision=1e-6):
@@ -382,28 +553,91 @@ def perform_boolean_difference(base_shape, tool_shapes, precision=1e-6):
     if not tool_shapes:
         return base_shape
     
+    # Subtract all tool shapes in one Cut
+    try:
+        result = _build_boolean(BRepAlgoAPI_Cut, [base_shape], tool_shapes, precision)
+        if result is not None:
+            return result
+        
+        log.warning("Warning: N-ary difference failed, subtracting tools one by one")
+        
+    except Exception as e:
+        log.warning(f"Warning: N-ary difference raised exception: {e}")
+    
     result = base_shape
     
-    # Subtract each tool shape
+    # Subtract each tool shape, skipping any that fail
     for i, tool in enumerate(tool_shapes):
         try:
-            cut_op = BRepAlgoAPI_Cut(result, tool)
-            cut_op.SetFuzzyValue(precision)
-            cut_op.Build()
+            cut_result = _build_boolean(BRepAlgoAPI_Cut, [result], [tool], precision)
             
-            if not cut_op.IsDone():
-                print(f"Warning: Difference operation {i} failed", file=sys.stderr)
+            if cut_result is None:
+                log.warning(f"Warning: Difference operation {i} failed")
                 continue
             
-            result = cut_op.Shape()
+            result = cut_result
             
         except Exception as e:
-            print(f"Warning: Difference operation {i} raised exception: {e}", file=sys.stderr)
+            log.warning(f"Warning: Difference operation {i} raised exception: {e}")
             continue
     
     return result
 
 
+def intern_polygons(solids):
+    """
+    Store solid polygons as shared tuples of (x, y) tuples
+    
+    Tuples are exact-sized and immutable, so solids with identical vertex
+    lists (repeated VIAs, fill shapes) can share a single polygon object.
+    This cuts the memory held by large inputs, and a shared polygon is
+    pickled only once per job when sent to worker processes. Tuples are
+    written back out as JSON arrays.
+    
+    Args:
+        solids: List of solid data dictionaries, updated in place
+    """
+    pool = {}
+    for solid_data in solids:
+        polygon = tuple(tuple(p) for p in solid_data['polygon'])
+        solid_data['polygon'] = pool.setdefault(polygon, polygon)
+
+
+def _quantize(value, precision=1e-6):
+    """
+    Snap a coordinate to the precision grid as an integer
+    
+    Quantized values compare with exact integer equality, which replaces
+    the tolerance test abs(a - b) < precision.
+    
+    Args:
+        value: Coordinate value
+        precision: Grid spacing
+    
+    Returns:
+        int: Grid index of the value
+    """
+    return round(value / precision)
+
+
+def _polygon_key(polygon, precision=1e-6):
+    """
+    Build a hashable footprint key for a polygon
+    
+    Each vertex is snapped to the precision grid, so polygons whose vertices
+    agree within the tolerance (in the same order) produce the same key.
+    
+    Args:
+        polygon: List of [x, y] coordinates
+        precision: Grid spacing used for quantization
+    
+    Returns:
+        tuple: Tuple of quantized (x, y) integer pairs
+    """
+    return tuple((_quantize(p[0], precision), _quantize(p[1], precision))
+                 for p in polygon)
+
+
 def group_by_material_and_continuity(solids, precision=1e-6):
     """
     Group solids by material and vertical continuity
@@ -412,6 +646,10 @@ def group_by_material_and_continuity(solids, precision=1e-6):
     together for merging. This allows vertical structures like VIAs to be merged
     into single continuous objects.
     
+    Solids are bucketed by material and quantized footprint, and each bucket
+    is swept once in z_bottom order to build the vertical chains, so grouping
+    is O(N log N) rather than a pairwise comparison of all solids.
+    
     Args:
         solids: List of solid data dictionaries
         precision: Geometric tolerance for z-coordinate matching
@@ -419,58 +657,51 @@ def group_by_material_and_continuity(solids, precision=1e-6):
     Returns:
         dict: Groups indexed by group key
     """
-    # First, group by material
-    material_groups = {}
+    # Bucket by material and footprint; only identical footprints can chain.
+    # Each entry is a (z_bottom, z_top, solid) record with z quantized to
+    # the precision grid, so the sort and sweep compare plain integers
+    buckets = defaultdict(list)
     for solid_data in solids:
         material = solid_data.get('material', 'unknown')
-        
-        if material not in material_groups:
-            material_groups[material] = []
-        
-        material_groups[material].append(solid_data)
+        key = _polygon_key(solid_data['polygon'], precision)
+        buckets[(material, key)].append(
+            (_quantize(solid_data.get('z_bottom', 0), precision),
+             _quantize(solid_data.get('z_top', 0), precision),
+             solid_data))
     
-    # Now, for each material, find vertically continuous chains
     groups = {}
     group_id = 0
     
-    for material, mat_solids in material_groups.items():
-        # Sort by z_bottom
-        mat_solids.sort(key=lambda s: s.get('z_bottom', 0))
-        
-        # Check for vertical continuity and same footprint
-        visited = [False] * len(mat_solids)
-        
-        for i in range(len(mat_solids)):
-            if visited[i]:
-                continue
-            
-            # Start a new group with this solid
-            group = [mat_solids[i]]
-            visited[i] = True
+    for (material, _), bucket in buckets.items():
+        # Most footprints occur once; those need no sorting or sweep
+        if len(bucket) == 1:
+            chains = [bucket]
+        else:
+            # Sort by z_bottom, then add each solid to the earliest chain
+            # with a member ending exactly where it starts on the grid.
+            # Every member's z_top stays open, so a solid can still join a
+            # chain below its most recent member
+            bucket.sort(key=operator.itemgetter(0))
             
-            # Try to extend the group downward (higher indices, higher z)
-            for j in range(i + 1, len(mat_solids)):
-                if visited[j]:
-                    continue
-                
-                # Check if j is vertically adjacent to any solid in current group
-                for group_solid in group:
-                    z_gap = abs(mat_solids[j]['z_bottom'] - group_solid['z_top'])
-                    
-                    if z_gap < precision:
-                        # Check if footprints match (same polygon)
-                        if polygons_match(mat_solids[j]['polygon'], 
-                                        group_solid['polygon'], 
-                                        precision):
-                            group.append(mat_solids[j])
-                            visited[j] = True
-                            break
+            chains = []
+            open_tops = {}
+            for record in bucket:
+                index = open_tops.get(record[0])
+                if index is None:
+                    index = len(chains)
+                    chains.append([record])
+                else:
+                    chains[index].append(record)
+                if open_tops.get(record[1], index) >= index:
+                    open_tops[record[1]] = index
+        
+        for chain_records in chains:
+            group = [record[2] for record in chain_records]
             
-            # Store this group
             if len(group) > 1:
                 # This is a vertically continuous group - merge them
                 group_key = f"material_{material}_group_{group_id}"
-                z_min = min(s['z_bottom'] for s in group)
+                z_min = group[0]['z_bottom']
                 z_max = max(s['z_top'] for s in group)
                 
                 groups[group_key] = {
@@ -484,17 +715,16 @@ def group_by_material_and_continuity(solids, precision=1e-6):
                         'merged': True
                     }
                 }
-                group_id += 1
             else:
-                # Single solid, use original grouping
+                # Single solid, passed through unchanged
                 s = group[0]
                 layer_name = s.get('layer_name', 'default')
                 z_bottom = s.get('z_bottom', 0)
                 z_top = s.get('z_top', 0)
-                group_key = f"{layer_name}_{z_bottom}_{z_top}"
+                group_key = f"{layer_name}_{z_bottom}_{z_top}_{group_id}"
                 
                 groups[group_key] = {
-                    'solids': [s],
+                    'solids': group,
                     'metadata': {
                         'layer_name': layer_name,
                         'z_bottom': z_bottom,
@@ -504,31 +734,167 @@ def group_by_material_and_continuity(solids, precision=1e-6):
                         'merged': False
                     }
                 }
+            group_id += 1
     
     return groups
 
 
-def polygons_match(poly1, poly2, precision=1e-6):
+def _dedupe_solids(solids, precision=1e-6):
+    """
+    Drop solids identical to an earlier one in the list
+    
+    GDSII layouts often repeat a footprint at the same place and height.
+    A repeat adds nothing to a union or intersection, or to the tools of a
+    difference, but would cost an extrusion and a Boolean argument.
+    
+    Args:
+        solids: List of solid data dictionaries
+        precision: Grid spacing used to compare coordinates
+    
+    Returns:
+        list: Solids in input order, first occurrence of each kept
+    """
+    seen = set()
+    unique = []
+    for solid_data in solids:
+        key = (_polygon_key(solid_data['polygon'], precision),
+               _quantize(solid_data['z_bottom'], precision),
+               _quantize(solid_data['z_top'], precision))
+        if key not in seen:
+            seen.add(key)
+            unique.append(solid_data)
+    return unique
+
+
+def _merge_z_ranges(solids, precision=1e-6):
+    """
+    Merge the z-ranges of solids into disjoint intervals
+    
+    Ranges touch when they meet on the precision grid, the same test
+    group_by_material_and_continuity uses to chain solids.
+    
+    Args:
+        solids: List of solid data dictionaries
+        precision: Grid spacing used to compare z-coordinates
+    
+    Returns:
+        list: Sorted list of (z_bottom, z_top) tuples
+    """
+    z_ranges = sorted((s['z_bottom'], s['z_top']) for s in solids)
+    
+    merged_ranges = [z_ranges[0]]
+    for z_bottom, z_top in z_ranges[1:]:
+        last_bottom, last_top = merged_ranges[-1]
+        if _quantize(z_bottom, precision) <= _quantize(last_top, precision):
+            merged_ranges[-1] = (last_bottom, max(last_top, z_top))
+        else:
+            merged_ranges.append((z_bottom, z_top))
+    
+    return merged_ranges
+
+
+def _process_one_layer(args):
     """
-    Check if two polygons have the same footprint
+    Merge the solids of a single layer group
+    
+    Top-level so it can run in a worker process. Only plain solid data
+    dicts cross the process boundary; OCC shapes are created and released
+    within the call.
     
     Args:
-        poly1, poly2: Lists of [x, y] coordinates
-        precision: Tolerance for coordinate comparison
+        args: Tuple of (layer_key, layer_info, operation, precision)
     
     Returns:
-        bool: True if polygons match
+        list: Solid data dictionaries produced for this layer
     """
-    if len(poly1) != len(poly2):
-        return False
+    layer_key, layer_info, operation, precision = args
+    layer_solids = layer_info['solids']
+    metadata = layer_info['metadata']
+    
+    log.debug("Processing layer: %s (z: %s to %s), input solids: %d",
+              metadata['layer_name'], metadata['z_bottom'], metadata['z_top'],
+              len(layer_solids))
+    
+    if len(layer_solids) == 1:
+        # Only one solid, no merging needed
+        return [layer_solids[0]]
+    
+    if metadata.get('merged', False):
+        # A vertical stack of identical footprints is exactly that footprint
+        # extruded over the whole z-range, so no OCC work is needed
+        merged_solid = {
+            'polygon': layer_solids[0]['polygon'],
+            'z_bottom': float(metadata['z_bottom']),
+            'z_top': float(metadata['z_top'])
+        }
+        merged_solid.update(metadata)
+        
+        log.debug("  Output solids: 1 (merged)")
+        return [merged_solid]
+    
+    first_polygon = layer_solids[0]['polygon']
+    first_key = _polygon_key(first_polygon, precision)
+    if operation == 'union' and all(_polygon_key(s['polygon'], precision) == first_key
+                                    for s in layer_solids[1:]):
+        # Identical footprints: the union is the footprint extruded over each
+        # run of overlapping or touching z-ranges, so no OCC work is needed
+        merged_solids = []
+        for z_bottom, z_top in _merge_z_ranges(layer_solids, precision):
+            merged_solid = {'polygon': first_polygon}
+            merged_solid.update(metadata)
+            merged_solid['z_bottom'] = float(z_bottom)
+            merged_solid['z_top'] = float(z_top)
+            merged_solids.append(merged_solid)
+        
+        log.debug("  Output solids: %d (merged)", len(merged_solids))
+        return merged_solids
     
-    # Simple check: compare all vertices
-    # This assumes polygons are in the same order
-    for p1, p2 in zip(poly1, poly2):
-        if abs(p1[0] - p2[0]) > precision or abs(p1[1] - p2[1]) > precision:
-            return False
+    # Repeats are dropped rather than built, so the Boolean never sees the
+    # same solid twice; the object of a difference is always kept
+    if operation == 'difference':
+        unique_solids = layer_solids[:1] + _dedupe_solids(layer_solids[1:], precision)
+    else:
+        unique_solids = _dedupe_solids(layer_solids, precision)
     
-    return True
+    try:
+        # Create OCC shapes from solid data
+        shapes = []
+        for solid_data in unique_solids:
+            shape = create_extruded_solid(
+                solid_data['polygon'],
+                solid_data['z_bottom'],
+                solid_data['z_top']
+            )
+            shapes.append(shape)
+        
+        # Perform boolean operation
+        if operation == 'union':
+            merged_shape = perform_boolean_union(shapes, precision)
+        elif operation == 'intersection':
+            merged_shape = perform_boolean_intersection(shapes, precision)
+        elif operation == 'difference':
+            if len(shapes) < 2:
+                merged_shape = shapes[0]
+            else:
+                merged_shape = perform_boolean_difference(shapes[0], shapes[1:], precision)
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+        
+        # Convert back to solid data
+        merged_solid = shape_to_solid_data(
+            merged_shape,
+            metadata['z_bottom'],
+            metadata['z_top'],
+            metadata
+        )
+        
+        log.debug("  Output solids: 1 (merged)")
+        return [merged_solid]
+        
+    except Exception as e:
+        log.warning(f"Warning: Failed to merge layer {layer_key}: {e}")
+        # Fall back to keeping original solids
+        return list(layer_solids)
 
 
 def merge_solids_by_layer(solids_data, operation='union', precision=1e-6, use_material_grouping=True):
@@ -556,7 +922,7 @@ def merge_solids_by_layer(solids_data, operation='union', precision=1e-6, use_ma
     # Choose grouping strategy
     if use_material_grouping:
         layers = group_by_material_and_continuity(solids, precision)
-        print(f"Grouped {len(solids)} solids into {len(layers)} groups (material-based)")
+        log.info(f"Grouped {len(solids)} solids into {len(layers)} groups (material-based)")
     else:
         # Original layer-based grouping
         layers = {}
@@ -582,76 +948,35 @@ def merge_solids_by_layer(solids_data, operation='union', precision=1e-6, use_ma
             
             layers[layer_key]['solids'].append(solid_data)
         
-        print(f"Grouped {len(solids)} solids into {len(layers)} layers (layer-based)")
+        log.info(f"Grouped {len(solids)} solids into {len(layers)} layers (layer-based)")
+    
+    # Single solids and vertical stacks are resolved without OCC; the rest
+    # need OCC work, which is independent per layer and runs in a process pool
+    occ_keys = [key for key, info in layers.items()
+                if len(info['solids']) > 1 and not info['metadata'].get('merged', False)]
+    occ_results = {}
+    workers = min(len(occ_keys), os.cpu_count() or 1)
+    
+    if workers > 1:
+        jobs = [(key, layers[key], operation, precision) for key in occ_keys]
+        with multiprocessing.Pool(processes=workers, initializer=set_occ_parallel_mode,
+                                  initargs=(False,)) as pool:
+            occ_results = dict(zip(occ_keys, pool.map(_process_one_layer, jobs)))
     
     merged_solids = []
     
-    # Process each layer
+    # Collect results in layer order
     for layer_key, layer_info in layers.items():
-        layer_solids = layer_info['solids']
-        metadata = layer_info['metadata']
-        
-        print(f"\nProcessing layer: {metadata['layer_name']} "
-              f"(z: {metadata['z_bottom']} to {metadata['z_top']})")
-        print(f"  Input solids: {len(layer_solids)}")
-        
-        if len(layer_solids) == 1:
-            # Only one solid, no merging needed
-            merged_solids.append(layer_solids[0])
-            continue
-        
-        try:
-            # Create OCC shapes from solid data
-            shapes = []
-            for solid_data in layer_solids:
-                shape = create_extruded_solid(
-                    solid_data['polygon'],
-                    solid_data['z_bottom'],
-                    solid_data['z_top']
-                )
-                shapes.append(shape)
-            
-            # Perform boolean operation
-            if operation == 'union':
-                merged_shape = perform_boolean_union(shapes, precision)
-            elif operation == 'intersection':
-                merged_shape = perform_boolean_intersection(shapes, precision)
-            elif operation == 'difference':
-                if len(shapes) < 2:
-                    merged_shape = shapes[0]
-                else:
-                    merged_shape = perform_boolean_difference(shapes[0], shapes[1:], precision)
-            else:
-                raise ValueError(f"Unknown operation: {operation}")
-            
-            # Convert back to solid data
-            # For vertically merged solids with same footprint, use original polygon
-            if len(layer_solids) > 1 and metadata.get('merged', False):
-                # Use polygon from first solid (they all match)
-                original_polygon = layer_solids[0]['polygon']
-                merged_solid = {
-                    'polygon': original_polygon,
-                    'z_bottom': float(metadata['z_bottom']),
-                    'z_top': float(metadata['z_top'])
-                }
-                # Add metadata
-                merged_solid.update(metadata)
-            else:
-                # Extract polygon from merged shape for other cases
-                merged_solid = shape_to_solid_data(
-                    merged_shape,
-                    metadata['z_bottom'],
-                    metadata['z_top'],
-                    metadata
-                )
-            
-            merged_solids.append(merged_solid)
-            print(f"  Output solids: 1 (merged)")
-            
-        except Exception as e:
-            print(f"Warning: Failed to merge layer {layer_key}: {e}", file=sys.stderr)
-            # Fall back to keeping original solids
-            merged_solids.extend(layer_solids)
+        if layer_key in occ_results:
+            merged_solids.extend(occ_results[layer_key])
+        else:
+            merged_solids.extend(_process_one_layer(
+                (layer_key, layer_info, operation, precision)))
+    
+    single_count = sum(1 for info in layers.values() if len(info['solids']) == 1)
+    log.info(f"Processed {len(layers)} groups: {single_count} single, "
+             f"{len(layers) - single_count - len(occ_keys)} vertical stacks, "
+             f"{len(occ_keys)} boolean merges; output solids: {len(merged_solids)}")
     
     return {
         'success': True,
@@ -665,17 +990,66 @@ def merge_solids_by_layer(solids_data, operation='union', precision=1e-6, use_ma
     }
 
 
+def read_json(filename):
+    """
+    Read a JSON file, using orjson when it is installed
+    
+    Args:
+        filename: Input JSON file path
+    
+    Returns:
+        Parsed JSON document
+    """
+    if orjson is not None:
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def write_json(filename, data):
+    """
+    Write data as compact JSON, using orjson when it is installed
+    
+    Args:
+        filename: Output JSON file path
+        data: JSON-serializable data
+    """
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data))
+        return
+    
+    with open(filename, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+
 def main():
     """Main entry point"""
-    if len(sys.argv) != 4:
-        print("Usage: python3 boolean_ops.py input.json output.json operation", 
+    # -v logs progress summaries, -vv also logs each layer
+    verbosity = sum(arg.count('v') for arg in sys.argv[1:] if arg.startswith('-v'))
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-v')]
+    
+    if len(args) != 3:
+        print("Usage: python3 boolean_ops.py [-v|-vv] input.json output.json operation", 
               file=sys.stderr)
         print("Operations: union, intersection, difference", file=sys.stderr)
         sys.exit(1)
     
-    input_json = sys.argv[1]
-    output_json = sys.argv[2]
-    operation = sys.argv[3].lower()
+    # Progress goes to stdout, which MATLAB captures, and warnings to stderr
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.WARNING)
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.WARNING)
+    
+    log_level = [logging.WARNING, logging.INFO, logging.DEBUG][min(verbosity, 2)]
+    logging.basicConfig(level=log_level, format='%(message)s',
+                        handlers=[stdout_handler, stderr_handler])
+    
+    input_json = args[0]
+    output_json = args[1]
+    operation = args[2].lower()
     
     # Validate operation
     if operation not in ['union', 'intersection', 'difference']:
@@ -699,8 +1073,8 @@ def main():
     
     try:
         # Read input JSON
-        with open(input_json, 'r') as f:
-            solids_data = json.load(f)
+        solids_data = read_json(input_json)
+        intern_polygons(solids_data.get('solids', []))
         
         # Get precision if specified
         precision = solids_data.get('precision', 1e-6)
@@ -709,8 +1083,7 @@ def main():
         result = merge_solids_by_layer(solids_data, operation, precision)
         
         # Write output JSON
-        with open(output_json, 'w') as f:
-            json.dump(result, f, indent=2)
+        write_json(output_json, result)
         
         if result['success']:
             print(f"\nBoolean operation completed successfully!")
@@ -7,13 +7,17 @@ This script reads a JSON file containing extruded polygon data
 and writes a STEP file using the pythonOCC library.
 
 Usage:
-    python3 step_writer.py input.json output.step
+    python3 step_writer.py [--verbose] input.json output.step
+
+    --verbose reports every solid as it is written; otherwise progress is
+    reported every PROGRESS_INTERVAL solids.
 
 Input JSON format:
 {
-  "format": "AP203",
+  "format": "AP203",  // or "AP214", "AP242"
   "precision": 1e-6,
   "units": 1.0,
+  "merge_by_layer": false,  // fuse the solids of each layer into one body
   "solids": [
     {
       "polygon": [[x1, y1], [x2, y2], ...],
@@ -26,6 +30,18 @@ Input JSON format:
   ]
 }
 
+Solids are built in a pool of worker processes, one per CPU by default.
+Set the STEP_WRITER_NPROC environment variable to change the number of
+workers (1 disables multiprocessing). Workers hand their solids back
+through BRep files in a temporary directory; for large batch runs point
+TMPDIR at a tmpfs to keep this traffic in memory.
+
+The STEP file is first written to output.step.tmp and then renamed over
+output.step, so an interrupted export never leaves a partial file.
+
+If the ijson package is installed the solids are streamed from the input
+file as they are parsed instead of being loaded all at once.
+
 Requirements:
     pip install pythonocc-core
 
@@ -35,22 +51,33 @@ Date: October 4, 2025
 
 import sys
 import json
+import logging
 import os
+import itertools
+import multiprocessing
+import shutil
+import tempfile
+from collections import OrderedDict, namedtuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 try:
-    from OCC.Core.gp import gp_Pnt, gp_Vec, gp_Dir, gp_Ax2, gp_Pln
+    from OCC.Core.gp import gp_Pnt, gp_Vec, gp_Trsf, gp_Pln
     from OCC.Core.BRepBuilderAPI import (
-        BRepBuilderAPI_MakeEdge,
-        BRepBuilderAPI_MakeWire,
         BRepBuilderAPI_MakeFace,
         BRepBuilderAPI_MakePolygon
     )
     from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakePrism
-    from OCC.Core.STEPControl import STEPControl_Writer, STEPControl_AsIs
-    from OCC.Core.IFSelect import IFSelect_RetDone
-    from OCC.Core.TopoDS import TopoDS_Compound, TopoDS_Shape
+    from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Fuse
+    from OCC.Core.TopTools import TopTools_ListOfShape
+    from OCC.Core.BOPAlgo import BOPAlgo_Options
+    from OCC.Core.OSD import OSD_Parallel, OSD_ThreadPool
+    from OCC.Core.TopoDS import TopoDS_Compound, TopoDS_Shape, TopoDS_Iterator
     from OCC.Core.BRep import BRep_Builder
-    from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
+    from OCC.Core.BRepTools import breptools_Read, breptools_Write
     from OCC.Core.TopLoc import TopLoc_Location
     PYTHONOCC_AVAILABLE = True
 except ImportError as e:
@@ -58,58 +85,289 @@ except ImportError as e:
     IMPORT_ERROR = str(e)
 
 
-def create_extruded_solid(polygon, z_bottom, z_top):
+log = logging.getLogger('step_writer')
+
+
+def _static(cls, name):
+    """Look up a static OCC method across pythonOCC naming conventions"""
+    return getattr(cls, name + '_s', None) or getattr(cls, name)
+
+
+def enable_occ_parallel_mode():
     """
-    Convert 2D polygon + height to OpenCASCADE extruded solid
+    Enable OCC's internal multithreading
+    
+    Algorithms that support it, such as the layer fuse, run on OCC's own
+    thread pool, which is sized to the number of CPUs.
+    
+    Returns:
+        int: Number of threads in the pool, or 0 if it could not be enabled
+    """
+    num_threads = os.cpu_count() or 1
+    try:
+        _static(OSD_Parallel, 'SetUseOcctThreads')(True)
+        _static(BOPAlgo_Options, 'SetParallelMode')(True)
+        _static(OSD_ThreadPool, 'DefaultPool')().Init(num_threads)
+    except Exception as e:
+        log.warning(f"Warning: Could not enable OCC parallel mode: {e}")
+        return 0
+    return num_threads
+
+
+OCC_THREADS = enable_occ_parallel_mode() if PYTHONOCC_AVAILABLE else 0
+
+# Fields of a solid definition needed to build it. Other input fields
+# (vertices, material, color) are dropped before solids reach the workers
+SolidRecord = namedtuple('SolidRecord', ['polygon', 'z_bottom', 'z_top', 'layer_name'])
+
+# Value of the write.step.schema parameter for each supported format
+STEP_SCHEMAS = {
+    'AP203': 'AP203',
+    'AP214': 'AP214IS',
+    'AP242': 'AP242DIS',
+}
+
+# Solids between progress messages
+PROGRESS_INTERVAL = 10000
+
+# Exports smaller than this are built serially
+PARALLEL_MIN_SOLIDS = 64
+
+# Number of solids handed to a worker process at a time
+STREAM_CHUNK_SIZE = 256
+
+# Default geometric tolerance when the input does not give one
+DEFAULT_PRECISION = 1e-6
+
+# Face cache keys and duplicate vertex removal use a grid this fraction
+# of precision, far enough below it that no real feature is lost
+KEY_GRID_FRACTION = 1e-3
+
+# Faces of recently seen polygon shapes, least recently used first
+FACE_CACHE_SIZE = 10000
+_face_cache = OrderedDict()
+
+# Plane z = 0 with a +Z normal, on which every cached face is built
+_XY_PLANE = gp_Pln() if PYTHONOCC_AVAILABLE else None
+
+# Extrusion vectors keyed by quantized height
+_VEC_CACHE_QUANTUM = 1e-12
+_vec_cache = {}
+
+
+class _DegeneratePolygon(Exception):
+    """Raised for polygons too small to produce a valid solid"""
+
+
+def _prepare_polygon(polygon, precision):
+    """
+    Normalize a polygon and check it is large enough to extrude
+    
+    The vertices themselves are kept as given: precision is a tolerance in
+    whatever units the coordinates use, so snapping to it could collapse
+    real features. Only duplicate removal and the face cache key use a
+    grid, KEY_GRID_FRACTION of precision, on which floating point noise
+    still compares equal. Slivers, with an extent below precision or an
+    area below precision squared, are rejected before any OCC call.
     
     Args:
         polygon: List of [x, y] coordinates
-        z_bottom: Bottom Z coordinate
-        z_top: Top Z coordinate
+        precision: Geometric tolerance; DEFAULT_PRECISION is used if not
+            positive
     
     Returns:
-        TopoDS_Shape: Extruded solid
+        tuple: (relative, x_min, y_min, key) where relative holds the
+            (x, y) vertices translated so the bounding box starts at the
+            origin, without the closing vertex, and key is relative in
+            grid units
+    
+    Raises:
+        ValueError: If the polygon has fewer than 3 vertices
+        _DegeneratePolygon: If the polygon area or extent is below precision
     """
-    # Remove duplicate last point if present (closed polygon)
-    if len(polygon) > 1 and polygon[0] == polygon[-1]:
-        polygon = polygon[:-1]
+    if precision <= 0:
+        precision = DEFAULT_PRECISION
+    grid = precision * KEY_GRID_FRACTION
+    
+    # Drop vertices repeating the previous one on the grid, while tracking
+    # the bounding box
+    points = []
+    cells = []
+    x_min = y_min = float('inf')
+    x_max = y_max = float('-inf')
+    for p in polygon:
+        x = float(p[0])
+        y = float(p[1])
+        cell = (round(x / grid), round(y / grid))
+        if cells and cell == cells[-1]:
+            continue
+        points.append((x, y))
+        cells.append(cell)
+        if x < x_min:
+            x_min = x
+        if x > x_max:
+            x_max = x
+        if y < y_min:
+            y_min = y
+        if y > y_max:
+            y_max = y
+    
+    # Drop the duplicate last point if present (closed polygon)
+    if len(cells) > 1 and cells[0] == cells[-1]:
+        points.pop()
+        cells.pop()
     
     if len(polygon) < 3:
         raise ValueError(f"Polygon must have at least 3 vertices, got {len(polygon)}")
     
-    # Create polygon wire at z_bottom
-    poly_maker = BRepBuilderAPI_MakePolygon()
+    # Skip slivers before any OCC call
+    if len(points) < 3:
+        raise _DegeneratePolygon(f"only {len(points)} distinct vertices")
+    
+    if x_max - x_min < precision or y_max - y_min < precision:
+        raise _DegeneratePolygon(f"extent {x_max - x_min:g} x {y_max - y_min:g} "
+                                 f"below precision")
+    
+    # Translate to the origin, accumulating twice the shoelace area in
+    # grid units
+    relative = []
+    key = []
+    twice_area = 0
+    i_prev = round((points[-1][0] - x_min) / grid)
+    j_prev = round((points[-1][1] - y_min) / grid)
+    for x, y in points:
+        x -= x_min
+        y -= y_min
+        i = round(x / grid)
+        j = round(y / grid)
+        relative.append((x, y))
+        key.append((i, j))
+        twice_area += i_prev * j - i * j_prev
+        i_prev = i
+        j_prev = j
+    
+    # Area below precision squared
+    area = 0.5 * abs(twice_area) * grid * grid
+    if area < precision * precision:
+        raise _DegeneratePolygon(f"area {area:g} below precision squared")
+    
+    return relative, x_min, y_min, tuple(key)
+
+
+def _make_polygon_wire(points):
+    """
+    Build a closed polygon wire in the plane z = 0
+    
+    A new BRepBuilderAPI_MakePolygon is needed per wire since it has no way
+    to be reset once closed; the face cache keeps this to one builder per
+    distinct footprint.
     
-    for point in polygon:
-        x, y = point[0], point[1]
-        pnt = gp_Pnt(x, y, z_bottom)
-        poly_maker.Add(pnt)
+    Args:
+        points: List of (x, y) float pairs without the closing vertex
     
-    # Close the polygon
-    poly_maker.Close()
+    Returns:
+        TopoDS_Wire: Closed polygon wire
+    """
+    if len(points) <= 4:
+        # Triangles and rectangles (most GDSII shapes) are built and closed
+        # by a single constructor call instead of one Add() per vertex
+        poly_maker = BRepBuilderAPI_MakePolygon(
+            *[gp_Pnt(x, y, 0.0) for x, y in points], True)
+    else:
+        poly_maker = BRepBuilderAPI_MakePolygon()
+        add_point = poly_maker.Add
+        make_point = gp_Pnt
+        
+        for x, y in points:
+            add_point(make_point(x, y, 0.0))
+        
+        # Close the polygon
+        poly_maker.Close()
     
     if not poly_maker.IsDone():
         raise RuntimeError("Failed to create polygon wire")
     
-    wire = poly_maker.Wire()
+    return poly_maker.Wire()
+
+
+def _make_face(points):
+    """
+    Build a planar face at z = 0 from a closed polygon
+    
+    Args:
+        points: List of (x, y) float pairs without the closing vertex
     
-    # Create face from wire
-    face_maker = BRepBuilderAPI_MakeFace(wire)
+    Returns:
+        TopoDS_Face: Face bounded by the polygon
+    """
+    wire = _make_polygon_wire(points)
+    
+    # Create face from wire on the known plane instead of letting OCC
+    # search for a surface through the wire; Inside=True orients the face
+    # to the region the wire encloses whatever its winding
+    face_maker = BRepBuilderAPI_MakeFace(_XY_PLANE, wire, True)
     
     if not face_maker.IsDone():
         raise RuntimeError("Failed to create face from wire")
     
-    face = face_maker.Face()
+    return face_maker.Face()
+
+
+def create_extruded_solid(polygon, z_bottom, z_top, precision=DEFAULT_PRECISION):
+    """
+    Convert 2D polygon + height to OpenCASCADE extruded solid
+    
+    Faces are cached by polygon shape, translated to the origin and
+    quantized to a grid far below precision, so repeated footprints (vias,
+    fill, fingers) are built once and moved into place.
+    
+    Args:
+        polygon: List of [x, y] coordinates
+        z_bottom: Bottom Z coordinate
+        z_top: Top Z coordinate
+        precision: Geometric tolerance used to match repeated polygons
+    
+    Returns:
+        TopoDS_Shape: Extruded solid
+    
+    Raises:
+        _DegeneratePolygon: If the polygon area or extent is below precision
+    """
+    # Normalize the vertices and skip slivers before any OCC call
+    relative, x_min, y_min, key = _prepare_polygon(polygon, precision)
     
     # Create extrusion vector
+    z_bottom = float(z_bottom)
     extrusion_height = z_top - z_bottom
     if abs(extrusion_height) < 1e-10:
         raise ValueError(f"Extrusion height too small: {extrusion_height}")
     
-    extrusion_vec = gp_Vec(0, 0, extrusion_height)
-    
-    # Extrude face to create solid
-    prism_maker = BRepPrimAPI_MakePrism(face, extrusion_vec)
+    # Look up the face of this polygon shape, built at the origin
+    face = _face_cache.get(key)
+    if face is None:
+        face = _make_face(relative)
+        _face_cache[key] = face
+        if len(_face_cache) > FACE_CACHE_SIZE:
+            _face_cache.popitem(last=False)
+    else:
+        _face_cache.move_to_end(key)
+    
+    # Move the face into place at z_bottom
+    trsf = gp_Trsf()
+    trsf.SetTranslation(gp_Vec(x_min, y_min, z_bottom))
+    face = face.Moved(TopLoc_Location(trsf))
+    
+    # Layers share a few heights, so reuse one vector per height
+    height_key = round(extrusion_height / _VEC_CACHE_QUANTUM)
+    extrusion_vec = _vec_cache.get(height_key)
+    if extrusion_vec is None:
+        extrusion_vec = gp_Vec(0, 0, extrusion_height)
+        _vec_cache[height_key] = extrusion_vec
+    
+    # Extrude face to create solid. The face is never modified, so the
+    # prism may share it instead of copying (Copy=False); canonization is
+    # kept so the side faces stay planes in the STEP output
+    prism_maker = BRepPrimAPI_MakePrism(face, extrusion_vec, False, True)
     
     if not prism_maker.IsDone():
         raise RuntimeError("Failed to extrude face")
@@ -119,62 +377,285 @@ def create_extruded_solid(polygon, z_bottom, z_top):
     return solid
 
 
-def write_step(solids_data, output_file, step_format='AP203'):
+def _build_chunk(args):
+    """
+    Build a chunk of solids and serialize them to a BRep file
+    
+    Top-level so it can run in a worker process. The solids are written as
+    one compound so that only a file path crosses the process boundary.
+    
+    Args:
+        args: Tuple of (start_idx, chunk_records, brep_path, precision)
+    
+    Returns:
+        tuple: (brep_path, results) with one (idx, info, error, built)
+            tuple per solid in results; error is None on success and
+            built is False for failed or skipped solids. If the BRep file
+            cannot be written, every built solid is reported as failed
+    """
+    start_idx, chunk_records, brep_path, precision = args
+    
+    compound = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(compound)
+    
+    results = []
+    for idx, record in enumerate(chunk_records, start=start_idx):
+        info = (record.layer_name, record.z_bottom, record.z_top)
+        try:
+            solid = _extrude_record(record, precision)
+            builder.Add(compound, solid)
+            results.append((idx, info, None, True))
+        except _DegeneratePolygon:
+            results.append((idx, info, None, False))
+        except Exception as e:
+            results.append((idx, info, str(e), False))
+    
+    if not breptools_Write(compound, brep_path):
+        # Without the file none of the built solids reach the parent
+        results = [(idx, info, "Failed to write BRep chunk", False) if built
+                   else (idx, info, error, built)
+                   for idx, info, error, built in results]
+    
+    return brep_path, results
+
+
+def _to_record(idx, solid_data):
+    """Reduce a solid definition to the SolidRecord used to build it"""
+    return SolidRecord(solid_data.get('polygon'),
+                       solid_data.get('z_bottom'),
+                       solid_data.get('z_top'),
+                       solid_data.get('layer_name', f'Layer_{idx}'))
+
+
+def _extrude_record(record, precision):
+    """Build the extruded solid of a SolidRecord"""
+    if record.polygon is None or record.z_bottom is None or record.z_top is None:
+        raise ValueError("Solid needs polygon, z_bottom and z_top")
+    return create_extruded_solid(record.polygon, record.z_bottom, record.z_top,
+                                 precision)
+
+
+def _worker_count():
+    """
+    Number of worker processes to use for building solids
+    
+    Set STEP_WRITER_NPROC to override the default of one per CPU.
+    """
+    num_proc = int(os.environ.get('STEP_WRITER_NPROC', os.cpu_count() or 1))
+    return max(1, num_proc)
+
+
+def _build_solids(solids, precision=DEFAULT_PRECISION):
+    """
+    Build extruded solids, in parallel when worthwhile
+    
+    The input is consumed lazily. Small exports, fewer than
+    PARALLEL_MIN_SOLIDS, are built serially, where process startup would
+    dominate.
+    
+    Args:
+        solids: Iterable of solid definitions
+        precision: Geometric tolerance
+    
+    Yields:
+        tuple: (idx, info, solid, error) in input order; info is the
+            (layer_name, z_bottom, z_top) of the solid and solid is None
+            on failure. Degenerate polygons are skipped, yielding None for
+            both solid and error
+    """
+    records = itertools.starmap(_to_record, enumerate(solids))
+    head = list(itertools.islice(records, PARALLEL_MIN_SOLIDS))
+    num_proc = _worker_count()
+    
+    if num_proc == 1 or len(head) < PARALLEL_MIN_SOLIDS:
+        for idx, record in enumerate(itertools.chain(head, records)):
+            info = (record.layer_name, record.z_bottom, record.z_top)
+            try:
+                solid = _extrude_record(record, precision)
+                yield idx, info, solid, None
+            except _DegeneratePolygon:
+                yield idx, info, None, None
+            except Exception as e:
+                yield idx, info, None, str(e)
+        return
+    
+    brep_dir = tempfile.mkdtemp(prefix='step_writer_')
+    
+    def jobs():
+        stream = itertools.chain(head, records)
+        start = 0
+        while True:
+            chunk = list(itertools.islice(stream, STREAM_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield (start, chunk, os.path.join(brep_dir, f"chunk_{start}.brep"),
+                   precision)
+            start += len(chunk)
+    
+    try:
+        with multiprocessing.Pool(processes=num_proc) as pool:
+            for brep_path, results in pool.imap(_build_chunk, jobs()):
+                iterator = None
+                if any(built for _, _, _, built in results):
+                    compound = TopoDS_Shape()
+                    if (breptools_Read(compound, brep_path, BRep_Builder())
+                            and not compound.IsNull()):
+                        iterator = TopoDS_Iterator(compound)
+                if os.path.exists(brep_path):
+                    os.remove(brep_path)
+                
+                # Built solids are stored in input order, failures skipped
+                for idx, info, error, built in results:
+                    if not built:
+                        yield idx, info, None, error
+                    elif iterator is None:
+                        yield idx, info, None, "Failed to read BRep chunk"
+                    elif not iterator.More():
+                        yield idx, info, None, "Solid missing from BRep chunk"
+                    else:
+                        yield idx, info, iterator.Value(), None
+                        iterator.Next()
+    finally:
+        shutil.rmtree(brep_dir, ignore_errors=True)
+
+
+def fuse_solids(solids, precision=DEFAULT_PRECISION):
+    """
+    Fuse solids into one shape with a single N-ary Boolean operation
+    
+    All solids go to one BRepAlgoAPI_Fuse, which intersects them in a
+    single pass instead of growing a result one union at a time.
+    
+    Args:
+        solids: List of at least two TopoDS_Shape objects
+        precision: Geometric tolerance
+    
+    Returns:
+        TopoDS_Shape: Fused shape, or None if the operation failed
+    """
+    argument_list = TopTools_ListOfShape()
+    argument_list.Append(solids[0])
+    
+    tool_list = TopTools_ListOfShape()
+    for solid in solids[1:]:
+        tool_list.Append(solid)
+    
+    fuse = BRepAlgoAPI_Fuse()
+    fuse.SetArguments(argument_list)
+    fuse.SetTools(tool_list)
+    fuse.SetFuzzyValue(precision)
+    fuse.SetRunParallel(True)
+    fuse.Build()
+    
+    if not fuse.IsDone() or fuse.HasErrors():
+        return None
+    
+    return fuse.Shape()
+
+
+def write_step(solids, output_file, step_format='AP203', precision=DEFAULT_PRECISION,
+               merge_by_layer=False):
     """
     Generate STEP file from solid definitions
     
     Args:
-        solids_data: Dictionary with solid definitions
+        solids: Iterable of solid definitions, consumed once
         output_file: Output STEP file path
-        step_format: STEP format ('AP203' or 'AP214')
+        step_format: STEP format ('AP203', 'AP214' or 'AP242')
+        precision: Geometric tolerance
+        merge_by_layer: Fuse the solids of each layer into one body
     """
     if not PYTHONOCC_AVAILABLE:
         raise ImportError(f"pythonOCC is not available: {IMPORT_ERROR}")
     
+    # Only needed here, so worker processes never load the STEP modules
+    from OCC.Core.STEPControl import STEPControl_Writer, STEPControl_AsIs
+    from OCC.Core.IFSelect import IFSelect_RetDone
+    from OCC.Core.Interface import Interface_Static_SetCVal
+    
+    if step_format not in STEP_SCHEMAS:
+        raise ValueError(f"Unsupported STEP format: {step_format}")
+    
     # Create STEP writer
     step_writer = STEPControl_Writer()
     
-    # Set STEP format
-    # Note: pythonOCC uses Interface_Static for format selection
-    # Default is typically AP203
+    # Set STEP format; the write.step.schema parameter is registered when
+    # the writer is created and read when shapes are transferred
+    if not Interface_Static_SetCVal("write.step.schema", STEP_SCHEMAS[step_format]):
+        raise RuntimeError(f"STEP format {step_format} is not supported by this OCC version")
     
     # Create compound to hold all solids
     compound = TopoDS_Compound()
     builder = BRep_Builder()
     builder.MakeCompound(compound)
     
-    solids = solids_data.get('solids', [])
+    log.info("Processing solids...")
+    
+    # Built solids of each layer, when merging by layer
+    layers = {}
     
-    if not solids:
+    # Process each solid, counting those added to the compound
+    num_solids = 0
+    num_skipped = 0
+    num_written = 0
+    for idx, info, solid, error in _build_solids(solids, precision):
+        num_solids += 1
+        if num_solids % PROGRESS_INTERVAL == 0:
+            log.info(f"  {num_solids} solids processed")
+        
+        if error is not None:
+            print(f"Warning: Failed to process solid {idx}: {error}", file=sys.stderr)
+            continue
+        
+        if solid is None:
+            num_skipped += 1
+            log.debug("  Solid %d: %s skipped (degenerate polygon)", idx + 1, info[0])
+            continue
+        
+        # Add to compound, or hold it back to be fused with the rest of
+        # its layer
+        if merge_by_layer:
+            layers.setdefault(info[0], []).append(solid)
+        else:
+            builder.Add(compound, solid)
+            num_written += 1
+        
+        # Optional: Add solid with metadata
+        # (Material and color support depends on STEP AP version)
+        log.debug("  Solid %d: %s (z: %.3f to %.3f)", idx + 1, *info)
+    
+    if num_solids == 0:
         raise ValueError("No solids to export")
     
-    print(f"Processing {len(solids)} solids...")
+    if num_skipped:
+        print(f"Warning: Skipped {num_skipped} degenerate solids "
+              f"(area or extent below precision)", file=sys.stderr)
     
-    # Process each solid
-    for idx, solid_data in enumerate(solids):
+    for layer_name, layer_solids in layers.items():
+        if len(layer_solids) == 1:
+            builder.Add(compound, layer_solids[0])
+            num_written += 1
+            continue
+        
+        log.debug(f"  Fusing {len(layer_solids)} solids on layer {layer_name}")
         try:
-            polygon = solid_data['polygon']
-            z_bottom = solid_data['z_bottom']
-            z_top = solid_data['z_top']
-            
-            # Create extruded solid
-            solid = create_extruded_solid(polygon, z_bottom, z_top)
-            
-            # Add to compound
-            builder.Add(compound, solid)
-            
-            # Optional: Add solid with metadata
-            # (Material and color support depends on STEP AP version)
-            layer_name = solid_data.get('layer_name', f'Layer_{idx}')
-            material = solid_data.get('material', '')
-            color = solid_data.get('color', '')
-            
-            print(f"  Solid {idx+1}: {layer_name} "
-                  f"(z: {z_bottom:.3f} to {z_top:.3f})")
-            
+            fused = fuse_solids(layer_solids, precision)
+            reason = "fuse failed"
         except Exception as e:
-            print(f"Warning: Failed to process solid {idx}: {e}", file=sys.stderr)
+            fused = None
+            reason = f"fuse raised exception: {e}"
+        
+        if fused is None:
+            print(f"Warning: Failed to fuse layer {layer_name} ({reason}), "
+                  f"writing its solids separately", file=sys.stderr)
+            for solid in layer_solids:
+                builder.Add(compound, solid)
+            num_written += len(layer_solids)
             continue
+        
+        builder.Add(compound, fused)
+        num_written += 1
     
     # Transfer compound to STEP writer
     status = step_writer.Transfer(compound, STEPControl_AsIs)
@@ -182,23 +663,76 @@ def write_step(solids_data, output_file, step_format='AP203'):
     if status != IFSelect_RetDone:
         raise RuntimeError(f"STEP transfer failed with status: {status}")
     
-    # Write STEP file
-    status = step_writer.Write(output_file)
+    # Write STEP file next to the output and rename it into place, so a
+    # failed or interrupted export never leaves a truncated file behind
+    temp_file = output_file + '.tmp'
+    try:
+        status = step_writer.Write(temp_file)
+        
+        if status != IFSelect_RetDone:
+            raise RuntimeError(f"STEP write failed with status: {status}")
+        
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
     
-    if status != IFSelect_RetDone:
-        raise RuntimeError(f"STEP write failed with status: {status}")
+    log.info(f"STEP file written successfully: {output_file} ({num_written} solids)")
+
+
+def _iter_solids(filename):
+    """Yield the entries of the 'solids' array of a JSON file as parsed"""
+    with open(filename, 'rb') as f:
+        yield from ijson.items(f, 'solids.item', use_float=True)
+
+
+def read_input_json(filename):
+    """
+    Read the header and solids of an input JSON file
+    
+    With ijson installed the solids are streamed from the file rather than
+    loaded at once. The header fields (format, precision, units) are then
+    taken from before the 'solids' array, which is where gds_write_step
+    writes them.
+    
+    Args:
+        filename: Input JSON file path
     
-    print(f"STEP file written successfully: {output_file}")
+    Returns:
+        tuple: (header, solids) where header is a dict of the top-level
+            scalar fields and solids is an iterable of solid definitions
+    """
+    if ijson is None:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        return data, data.get('solids', [])
+    
+    header = {}
+    with open(filename, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == 'solids':
+                break
+            if '.' not in prefix and event in ('string', 'number', 'boolean', 'null'):
+                header[prefix] = value
+    
+    return header, _iter_solids(filename)
 
 
 def main():
     """Main entry point"""
-    if len(sys.argv) != 3:
-        print("Usage: python3 step_writer.py input.json output.step", file=sys.stderr)
+    verbose = '--verbose' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--verbose']
+    
+    if len(args) != 2:
+        print("Usage: python3 step_writer.py [--verbose] input.json output.step",
+              file=sys.stderr)
         sys.exit(1)
     
-    input_json = sys.argv[1]
-    output_step = sys.argv[2]
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO,
+                        format='%(message)s', stream=sys.stdout)
+    
+    input_json = args[0]
+    output_step = args[1]
     
     # Check if input file exists
     if not os.path.exists(input_json):
@@ -214,16 +748,19 @@ def main():
         print("  pip install pythonocc-core", file=sys.stderr)
         sys.exit(1)
     
+    log.debug(f"OCC parallel mode: {OCC_THREADS} threads")
+    
     try:
         # Read input JSON
-        with open(input_json, 'r') as f:
-            solids_data = json.load(f)
+        header, solids = read_input_json(input_json)
         
         # Get format
-        step_format = solids_data.get('format', 'AP203')
+        step_format = header.get('format', 'AP203')
+        precision = header.get('precision', DEFAULT_PRECISION)
+        merge_by_layer = bool(header.get('merge_by_layer', False))
         
         # Write STEP file
-        write_step(solids_data, output_step, step_format)
+        write_step(solids, output_step, step_format, precision, merge_by_layer)
         
         sys.exit(0)
         